@@ -0,0 +1,76 @@
+# benchmarks/import_time.py
+# Presupuesto de arranque en frío: tiempo de importación del backend por módulo (python -X importtime)
+#
+#   python src/benchmarks/import_time.py --budget-ms 1500 --top 20
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "netfix-backend.py")
+# Integraciones que deben importarse solo cuando se usan
+LAZY_MODULES = ("stripe", "nmap", "redis")
+
+MARKER = "-- netfix-backend import --"
+IMPORT = """import importlib, json, os, sys, time
+sys.path.insert(0, os.path.dirname(sys.argv[1]))
+print(%r, file=sys.stderr, flush=True)
+started = time.perf_counter()
+importlib.import_module("netfix-backend")
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed_ms": elapsed * 1000, "modules": sorted(sys.modules)}))
+""" % MARKER
+
+
+def parse_importtime(stderr: str) -> list:
+    # Módulos de primer nivel cargados por el backend: su tiempo acumulado incluye sus dependencias
+    lines = stderr.splitlines()
+    modules = []
+    for line in lines[lines.index(MARKER) + 1:]:
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            modules.append((int(cumulative) / 1000, name.strip()))
+    return sorted(modules, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget for the backend module")
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    env = {**os.environ, "DATABASE_URL": os.getenv("DATABASE_URL", "sqlite:///:memory:")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT, BACKEND],
+        capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(result.stderr)
+    eager = [name for name in LAZY_MODULES if name in report["modules"]]
+
+    for cumulative_ms, name in modules[:args.top]:
+        print(f"{cumulative_ms:9.1f} ms  {name}")
+    print(f"\ntotal import: {report['elapsed_ms']:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if eager:
+        print(f"imported eagerly: {', '.join(eager)}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "elapsed_ms": report["elapsed_ms"],
+                "budget_ms": args.budget_ms,
+                "eager_lazy_modules": eager,
+                "modules": [{"module": name, "cumulative_ms": cumulative_ms} for cumulative_ms, name in modules],
+            }, f, indent=2)
+    if report["elapsed_ms"] > args.budget_ms or eager:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+# benchmarks/load_test.py
+# Prueba de carga reproducible de /register, /token, /scan y /scan/free, sin acceso a red:
+# nmap falso (o el escáner nativo), servidor TLS local con certificado de prueba y SQLite
+#
+#   python src/benchmarks/load_test.py --concurrency 1,8,32 --requests 200 --output run.json
+#   python src/benchmarks/load_test.py --baseline run.json --output new.json
+import argparse
+import asyncio
+import http.server
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "netfix-backend.py")
+SCENARIOS = ("register", "token", "scan", "scan_e2e", "scan_free")
+TARGET = "localhost"
+
+FAKE_NMAP = """#!{python}
+import sys
+if "-V" in sys.argv:
+    print("Nmap version 7.94 ( https://nmap.org )")
+    sys.exit(0)
+host = [arg for arg in sys.argv[1:] if not arg.startswith("-")][-1]
+print('''<?xml version="1.0"?><nmaprun scanner="nmap" args="nmap" start="0" version="7.94">
+<scaninfo type="connect" protocol="tcp" numservices="100" services="22,443"/>
+<host><status state="up" reason="syn-ack"/><address addr="%s" addrtype="ipv4"/><hostnames/>
+<ports><port protocol="tcp" portid="22"><state state="open" reason="syn-ack"/><service name="ssh"/></port>
+<port protocol="tcp" portid="443"><state state="open" reason="syn-ack"/><service name="https"/></port></ports></host>
+<runstats><finished time="0" timestr="" elapsed="0.01"/><hosts up="1" down="0" total="1"/></runstats></nmaprun>''' % host)
+"""
+
+# Arranque del backend importándolo por nombre, como hace uvicorn "netfix-backend:app":
+# el pool de procesos de bcrypt necesita que sus funciones se puedan importar en los hijos
+BOOT = """import importlib, os, sys, uvicorn
+sys.path.insert(0, os.path.dirname(sys.argv[1]))
+module = importlib.import_module("netfix-backend")
+uvicorn.run(module.app, host="127.0.0.1", port=int(sys.argv[2]), log_level="warning")
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def write_certificate(directory: str) -> tuple:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, TARGET)])
+    now = datetime.utcnow()
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=90))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName(TARGET)]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    return cert_path, key_path
+
+
+class TargetHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Strict-Transport-Security", "max-age=31536000")
+        self.send_header("X-Content-Type-Options", "nosniff")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_HEAD
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_target(port: int, cert_path: str, key_path: str):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), TargetHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    server.serve_forever()
+
+
+def start_backend(args, workdir: str, target_port: int) -> tuple:
+    bin_dir = os.path.join(workdir, "bin")
+    os.makedirs(bin_dir)
+    nmap_path = os.path.join(bin_dir, "nmap")
+    with open(nmap_path, "w") as f:
+        f.write(FAKE_NMAP.format(python=sys.executable))
+    os.chmod(nmap_path, 0o755)
+
+    port = free_port()
+    env = {
+        **os.environ,
+        "PATH": bin_dir + os.pathsep + os.environ.get("PATH", ""),
+        "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "BCRYPT_ROUNDS": str(args.rounds),
+        "SCAN_PORT_ENGINE": args.port_engine,
+        "SCAN_HTTPS_PORT": str(target_port),
+        "SCAN_WORKERS": str(args.scan_workers),
+        # Sin cuotas ni límites de tasa: se mide el servicio, no las políticas
+        "SCAN_TIER_LIMITS": "{}",
+        "RATE_LIMIT_ENABLED": "false",
+        "MONITOR_ENABLED": "false",
+    }
+    if args.free_cache_ttl is not None:
+        env["FREE_SCAN_CACHE_TTL"] = str(args.free_cache_ttl)
+    subprocess.run([sys.executable, BACKEND, "migrate"], env=env, check=True, stdout=subprocess.DEVNULL)
+    process = subprocess.Popen([sys.executable, "-c", BOOT, BACKEND, str(port)], env=env)
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def wait_ready(client: httpx.AsyncClient, process: subprocess.Popen):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Backend exited during startup")
+        try:
+            if (await client.get("/stats/cache")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Backend did not start in 30 s")
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+class Scenario:
+    def __init__(self, client: httpx.AsyncClient, name: str, run_id: str):
+        self.client = client
+        self.name = name
+        self.run_id = run_id
+        self.headers = {}
+        self.sequence = 0
+
+    async def setup(self):
+        if self.name in ("token", "scan", "scan_e2e"):
+            email = f"bench-{self.run_id}-{self.name}@example.com"
+            await self.client.post("/register", json={"email": email, "password": "bench", "company_name": "bench"})
+            response = await self.client.post("/token", data={"username": email, "password": "bench"})
+            response.raise_for_status()
+            self.email = email
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def request(self):
+        if self.name == "register":
+            # Un correo nuevo por petición, también entre niveles y calentamiento
+            self.sequence += 1
+            email = f"bench-{self.run_id}-{self.sequence}@example.com"
+            response = await self.client.post(
+                "/register", json={"email": email, "password": "bench", "company_name": "bench"}
+            )
+        elif self.name == "token":
+            response = await self.client.post("/token", data={"username": self.email, "password": "bench"})
+        elif self.name == "scan_free":
+            response = await self.client.post("/scan/free", json={"target_url": TARGET, "scan_type": "free"})
+        else:
+            response = await self.client.post(
+                "/scan", json={"target_url": TARGET, "scan_type": "basic"}, headers=self.headers
+            )
+            if self.name == "scan_e2e" and response.status_code == 200:
+                response = await self.wait_completed(response.json()["scan_id"])
+        response.raise_for_status()
+
+    async def wait_completed(self, scan_id: int) -> httpx.Response:
+        while True:
+            response = await self.client.get(f"/scan/{scan_id}", headers=self.headers)
+            if response.status_code != 200 or response.json()["status"] in ("completed", "failed", "cancelled"):
+                return response
+            await asyncio.sleep(0.05)
+
+
+async def run_level(scenario: Scenario, concurrency: int, requests: int) -> dict:
+    latencies = []
+    errors = 0
+    issued = 0
+
+    async def user():
+        nonlocal issued, errors
+        while issued < requests:
+            issued += 1
+            started = time.perf_counter()
+            try:
+                await scenario.request()
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "scenario": scenario.name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+    }
+
+
+async def run_benchmarks(args, base_url: str, process: subprocess.Popen) -> list:
+    limits = httpx.Limits(max_connections=max(args.concurrency) * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        await wait_ready(client, process)
+        run_id = str(int(time.time()))
+        results = []
+        for name in args.scenarios:
+            scenario = Scenario(client, name, run_id)
+            await scenario.setup()
+            # Calentamiento: conexiones, cachés y pools fuera de la medición
+            await run_level(scenario, 1, args.warmup)
+            for concurrency in args.concurrency:
+                result = await run_level(scenario, concurrency, args.requests)
+                results.append(result)
+                latency = result["latency_ms"]
+                print(
+                    f"{name:<10} c={concurrency:<4} {result['throughput_rps']:9.1f} req/s  "
+                    f"p50={latency['p50']:8.1f}  p95={latency['p95']:8.1f}  p99={latency['p99']:8.1f} ms"
+                    f"  errors={result['errors']}"
+                )
+        return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(BACKEND), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(baseline: dict, current: dict, max_regression: float) -> bool:
+    # Regresión: p95 más alto o throughput más bajo que la línea base por encima del margen
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    regressed = False
+    print(f"\nvs baseline {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    for result in current["results"]:
+        before = previous.get((result["scenario"], result["concurrency"]))
+        if before is None:
+            continue
+        p95_change = result["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1 if before["latency_ms"]["p95"] else 0.0
+        rps_change = result["throughput_rps"] / before["throughput_rps"] - 1 if before["throughput_rps"] else 0.0
+        worse = p95_change > max_regression or rps_change < -max_regression
+        regressed = regressed or worse
+        print(
+            f"{result['scenario']:<10} c={result['concurrency']:<4} p95 {p95_change:+7.1%}  "
+            f"throughput {rps_change:+7.1%}{'  REGRESSION' if worse else ''}"
+        )
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test of the FastAPI backend")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        type=lambda value: [name for name in value.split(",") if name])
+    parser.add_argument("--concurrency", default="1,8,32",
+                        type=lambda value: [int(level) for level in value.split(",")])
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones por nivel de concurrencia")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=int(os.getenv("BCRYPT_ROUNDS", "12")))
+    parser.add_argument("--port-engine", choices=("nmap", "native"), default="nmap",
+                        help="nmap: binario falso con respuesta fija; native: connect scan contra localhost")
+    parser.add_argument("--scan-workers", type=int, default=4)
+    parser.add_argument("--free-cache-ttl", type=float, help="0 fuerza un escaneo real por petición")
+    parser.add_argument("--database-url", help="Por defecto SQLite en un directorio temporal")
+    parser.add_argument("--output", help="Guardar resultados en JSON")
+    parser.add_argument("--baseline", help="Comparar con un JSON anterior")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory(prefix="netfix-bench-") as workdir:
+        cert_path, key_path = write_certificate(workdir)
+        target_port = free_port()
+        target = multiprocessing.Process(target=serve_target, args=(target_port, cert_path, key_path), daemon=True)
+        target.start()
+        process, base_url = start_backend(args, workdir, target_port)
+        try:
+            results = asyncio.run(run_benchmarks(args, base_url, process))
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+            target.terminate()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "bcrypt_rounds": args.rounds,
+            "port_engine": args.port_engine,
+            "scan_workers": args.scan_workers,
+            "database": "custom" if args.database_url else "sqlite",
+            "requests_per_level": args.requests,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            if compare(json.load(f), report, args.max_regression):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
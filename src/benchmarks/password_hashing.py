@@ -0,0 +1,73 @@
+# benchmarks/password_hashing.py
+# Rendimiento de login (bcrypt.checkpw) según el número de procesos del pool
+#
+#   python src/benchmarks/password_hashing.py --rounds 12 --logins 200
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+
+def verify(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+def run_inline(password: bytes, hashed: bytes, logins: int) -> float:
+    started = time.perf_counter()
+    for _ in range(logins):
+        verify(password, hashed)
+    return logins / (time.perf_counter() - started)
+
+
+def run_pool(password: bytes, hashed: bytes, logins: int, workers: int) -> float:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Calentamiento: arranque de los procesos fuera de la medición
+        list(pool.map(verify, [password] * workers, [hashed] * workers))
+        started = time.perf_counter()
+        list(pool.map(verify, [password] * logins, [hashed] * logins))
+        return logins / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput vs bcrypt pool size")
+    parser.add_argument("--rounds", type=int, default=int(os.getenv("BCRYPT_ROUNDS", "12")))
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    password = b"benchmark-password"
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(args.rounds))
+
+    results = {
+        "rounds": args.rounds,
+        "logins": args.logins,
+        "cpu_count": os.cpu_count(),
+        "inline_logins_per_sec": run_inline(password, hashed, max(1, args.logins // 4)),
+        "pool": [],
+    }
+    print(f"bcrypt rounds={args.rounds}  inline: {results['inline_logins_per_sec']:.1f} logins/s")
+
+    # 1, 2, 4, ... hasta el número de núcleos
+    worker_counts = [1]
+    while worker_counts[-1] * 2 < args.max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+    if args.max_workers > 1:
+        worker_counts.append(args.max_workers)
+
+    for workers in worker_counts:
+        throughput = run_pool(password, hashed, args.logins, workers)
+        speedup = throughput / results["inline_logins_per_sec"]
+        results["pool"].append({"workers": workers, "logins_per_sec": throughput, "speedup": speedup})
+        print(f"workers={workers:<3} {throughput:8.1f} logins/s  x{speedup:.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# benchmarks/server_scaling.py
+# Throughput de `netfix-backend.py serve` según el número de workers pre-fork
+#
+#   python src/benchmarks/server_scaling.py --max-workers 4 --duration 10 --output scaling.json
+#
+# Cada nivel mide GET /scans (JWT, consulta a SQLite y serialización de 50 filas) con los
+# workers fijados a los primeros núcleos y los clientes de carga en el resto, si hay núcleos libres
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "netfix-backend.py")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def pin(cores: list):
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+
+def backend_env(workdir: str) -> dict:
+    return {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'scaling.db')}",
+        "BCRYPT_ROUNDS": "4",
+        "SCAN_PORT_ENGINE": "native",
+        "RATE_LIMIT_ENABLED": "false",
+        "MONITOR_ENABLED": "false",
+        "SERVER_HOST": "127.0.0.1",
+    }
+
+
+def seed(workdir: str, scans: int) -> str:
+    # Usuario por la API (hash de bcrypt real) y escaneos directamente en SQLite
+    env = backend_env(workdir)
+    subprocess.run([sys.executable, BACKEND, "migrate"], env=env, check=True, stdout=subprocess.DEVNULL)
+    port = free_port()
+    process = start_server(env, port, 1, [])
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            wait_ready(client, process)
+            credentials = {"username": "bench@example.com", "password": "benchmark-password"}
+            client.post("/register", json={
+                "email": credentials["username"], "password": credentials["password"], "company_name": "bench"
+            }).raise_for_status()
+            response = client.post("/token", data=credentials)
+            response.raise_for_status()
+            token = response.json()["access_token"]
+    finally:
+        stop_server(process)
+    db = sqlite3.connect(os.path.join(workdir, "scaling.db"))
+    user_id = db.execute("SELECT id FROM users").fetchone()[0]
+    now = datetime.utcnow()
+    db.executemany(
+        "INSERT INTO scans (user_id, scan_type, target_url, status, results, created_at, attempts) "
+        "VALUES (?, 'basic', ?, 'completed', ?, ?, 0)",
+        [
+            (user_id, f"host{i % 20}.example.com", json.dumps({"port_scan": [22, 80, 443]}),
+             (now - timedelta(minutes=i)).isoformat(sep=" "))
+            for i in range(scans)
+        ],
+    )
+    db.commit()
+    db.close()
+    return token
+
+
+def start_server(env: dict, port: int, workers: int, cores: list) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, BACKEND, "serve"],
+        env={**env, "SERVER_PORT": str(port), "SERVER_WORKERS": str(workers)},
+        preexec_fn=(lambda: pin(cores)) if cores else None,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def stop_server(process: subprocess.Popen):
+    # SIGTERM al maestro: reenvía la parada ordenada a sus workers
+    process.terminate()
+    process.wait(timeout=30)
+
+
+def wait_ready(client: httpx.Client, process: subprocess.Popen):
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"backend exited with code {process.returncode}")
+        try:
+            if client.get("/stats/cache").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("backend did not become ready")
+
+
+async def drive(url: str, path: str, token: str, concurrency: int, duration: float) -> tuple:
+    completed = errors = 0
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=30, limits=limits) as client:
+        deadline = time.monotonic() + duration
+
+        async def loop():
+            nonlocal completed, errors
+            while time.monotonic() < deadline:
+                try:
+                    response = await client.get(path, headers=headers)
+                    if response.status_code == 200:
+                        completed += 1
+                    else:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+    return completed, errors
+
+
+def client_process(url: str, path: str, token: str, concurrency: int, duration: float, cores: list) -> tuple:
+    pin(cores)
+    return asyncio.run(drive(url, path, token, concurrency, duration))
+
+
+def run_level(args, env: dict, token: str, workers: int, server_cores: list, client_cores: list) -> dict:
+    port = free_port()
+    process = start_server(env, port, workers, server_cores[:workers])
+    url = f"http://127.0.0.1:{port}"
+    try:
+        with httpx.Client(base_url=url, timeout=30) as client:
+            wait_ready(client, process)
+            # Calentamiento: lifespan y conexiones de todos los workers fuera de la medición
+            for _ in range(workers * 20):
+                client.get(args.path, headers={"Authorization": f"Bearer {token}"})
+        clients = args.client_processes or max(1, workers)
+        with multiprocessing.Pool(clients) as pool:
+            started = time.perf_counter()
+            counts = pool.starmap(client_process, [
+                (url, args.path, token, args.concurrency, args.duration, client_cores)
+            ] * clients)
+            elapsed = time.perf_counter() - started
+    finally:
+        stop_server(process)
+    completed = sum(count for count, _ in counts)
+    return {
+        "workers": workers,
+        "client_processes": clients,
+        "requests": completed,
+        "errors": sum(error for _, error in counts),
+        "throughput_rps": round(completed / elapsed, 1),
+    }
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Request throughput of the pre-fork server vs worker count")
+    parser.add_argument("--max-workers", type=int, default=max(1, cpu_count // 2))
+    parser.add_argument("--duration", type=float, default=10, help="Segundos por nivel")
+    parser.add_argument("--concurrency", type=int, default=16, help="Conexiones por proceso cliente")
+    parser.add_argument("--client-processes", type=int, help="Por defecto, uno por worker")
+    parser.add_argument("--scans", type=int, default=200, help="Escaneos sembrados para GET /scans")
+    parser.add_argument("--path", default="/scans?limit=50")
+    parser.add_argument("--min-efficiency", type=float, default=0.0,
+                        help="Falla si algún nivel escala por debajo de esta fracción del ideal lineal")
+    parser.add_argument("--output", help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    # Workers en los primeros núcleos y clientes en el resto, para que no compitan por la CPU
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+    server_cores, client_cores = cores[:args.max_workers], cores[args.max_workers:]
+    if len(cores) < args.max_workers * 2:
+        print("warning: not enough cores to keep clients off the server cores; scaling will look sublinear")
+        server_cores, client_cores = [], []
+
+    # 1, 2, 4, ... hasta --max-workers
+    worker_counts = [1]
+    while worker_counts[-1] * 2 < args.max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+    if args.max_workers > 1:
+        worker_counts.append(args.max_workers)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="netfix-scaling-") as workdir:
+        token = seed(workdir, args.scans)
+        env = backend_env(workdir)
+        for workers in worker_counts:
+            result = run_level(args, env, token, workers, server_cores, client_cores)
+            result["speedup"] = round(result["throughput_rps"] / results[0]["throughput_rps"], 2) if results else 1.0
+            result["efficiency"] = round(result["speedup"] / workers, 2)
+            results.append(result)
+            print(
+                f"workers={workers:<3} {result['throughput_rps']:9.1f} req/s  x{result['speedup']:.2f}"
+                f"  efficiency={result['efficiency']:.0%}  errors={result['errors']}"
+            )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": cpu_count,
+            "path": args.path,
+            "duration": args.duration,
+            "pinned": bool(server_cores),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if any(result["efficiency"] < args.min_efficiency for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# tests/conftest.py
+# El backend es un único fichero con guion en el nombre: se carga una vez por sesión
+# contra una base de datos SQLite temporal, sin el lifespan ni sus workers en segundo plano
+import asyncio
+import importlib.util
+import os
+import sys
+import tempfile
+from itertools import count
+
+import pytest
+from anyio.from_thread import start_blocking_portal
+
+WORKDIR = tempfile.mkdtemp(prefix="netfix-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(WORKDIR, 'netfix.db')}",
+    "BCRYPT_ROUNDS": "4",
+    "SCAN_PORT_ENGINE": "native",
+    "SCAN_QUEUE_BACKEND": "memory",
+    "SCAN_ARCHIVE_DIR": os.path.join(WORKDIR, "archive"),
+    "STRIPE_PRICE_TIERS": '{"price_basic": "basic", "price_pro": "professional"}',
+    "MONITOR_ENABLED": "false",
+})
+
+BACKEND_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "netfix-backend.py")
+_user_ids = count(1)
+
+
+@pytest.fixture(scope="session")
+def portal():
+    with start_blocking_portal() as portal:
+        yield portal
+
+
+@pytest.fixture(scope="session")
+def backend(portal):
+    spec = importlib.util.spec_from_file_location("netfix_backend", BACKEND_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["netfix_backend"] = module
+    spec.loader.exec_module(module)
+    portal.call(module.run_migrations)
+    # Colas que normalmente crea el lifespan
+    portal.call(_create_queues, module)
+    yield module
+    portal.call(module.engine.dispose)
+
+
+async def _create_queues(module):
+    module.scan_queue = asyncio.Queue(maxsize=module.SCAN_QUEUE_SIZE)
+    module.stripe_event_queue = asyncio.Queue()
+
+
+@pytest.fixture
+def run(portal):
+    # Ejecuta una corrutina en el bucle de la sesión, el mismo del pool de conexiones
+    def run(function, *args):
+        return portal.call(function, *args)
+    return run
+
+
+@pytest.fixture
+def make_user(backend, run):
+    def make_user(tier: str = "basic"):
+        number = next(_user_ids)
+
+        async def create():
+            async with backend.SessionLocal() as db:
+                user = backend.User(
+                    email=f"user{number}@example.com",
+                    hashed_password="x",
+                    company_name="test",
+                    subscription_tier=tier,
+                )
+                db.add(user)
+                await db.commit()
+                return backend.CurrentUser(id=user.id, email=user.email, subscription_tier=tier)
+        return run(create)
+    return make_user
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+# Un mes muy anterior al de las filas que crean los demás tests
+MONTH = datetime(2001, 3, 1)
+
+
+def test_archived_month_round_trips(backend, run, monkeypatch):
+    # Bloques pequeños: la búsqueda tiene que saltar a un bloque que no es el primero
+    monkeypatch.setattr(backend, "SCAN_ARCHIVE_BLOCK_ROWS", 2)
+    rows = [
+        {
+            "status": "completed",
+            "created_at": datetime(2001, 3, day, 12, 30),
+            "results": {"target": f"archive{day}.example", "ports": [22, 443], "note": "ñ"},
+        }
+        for day in range(1, 6)
+    ]
+
+    async def add():
+        async with backend.SessionLocal() as db:
+            scans = [
+                backend.Scan(user_id=0, scan_type="basic", target_url=f"archive{number}.example", **values)
+                for number, values in enumerate(rows, start=1)
+            ]
+            # Fuera del mes: no se archiva
+            scans.append(backend.Scan(
+                user_id=0, scan_type="basic", target_url="april.example",
+                status="completed", created_at=datetime(2001, 4, 1),
+            ))
+            db.add_all(scans)
+            await db.commit()
+            return [scan.id for scan in scans]
+    *scan_ids, april_id = run(add)
+
+    archive = run(backend.archive_scan_month, MONTH)
+    assert archive["row_count"] == len(rows)
+    assert (archive["min_id"], archive["max_id"]) == (scan_ids[0], scan_ids[-1])
+    assert len(archive["blocks"]) == 3
+
+    async def load():
+        async with backend.SessionLocal() as db:
+            remaining = await db.scalar(
+                select(func.count(backend.Scan.id)).where(backend.Scan.id.in_(scan_ids + [april_id]))
+            )
+            loaded = [await backend.get_scan_or_archived(db, scan_id) for scan_id in scan_ids]
+            return remaining, loaded
+    remaining, loaded = run(load)
+
+    assert remaining == 1
+    for scan_id, values, scan in zip(scan_ids, rows, loaded):
+        assert scan.id == scan_id
+        assert scan.status == values["status"]
+        assert scan.created_at == values["created_at"]
+        assert scan.results == values["results"]
+
+
+def test_empty_month_writes_no_archive(backend, run):
+    assert run(backend.archive_scan_month, datetime(1999, 1, 1)) is None
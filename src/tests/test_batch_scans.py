@@ -0,0 +1,75 @@
+import asyncio
+
+from sqlalchemy import select
+
+
+def fake_results():
+    return {"port_scan": [443], "ssl_check": {}, "headers_check": {}}
+
+
+async def make_user_async(backend, name):
+    async with backend.SessionLocal() as db:
+        user = backend.User(
+            email=f"{name}@example.com", hashed_password="x", company_name="test", subscription_tier="professional"
+        )
+        db.add(user)
+        await db.commit()
+        return backend.CurrentUser(id=user.id, email=user.email, subscription_tier="professional")
+
+
+def test_batches_share_the_process_concurrency_limit(backend, run, monkeypatch):
+    running, peak = 0, 0
+
+    async def scan(target_url, progress=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return fake_results()
+    monkeypatch.setattr(backend, "perform_basic_scan", scan)
+
+    async def batches():
+        monkeypatch.setattr(backend, "batch_scan_slots", asyncio.Semaphore(2))
+        users = await asyncio.gather(*(make_user_async(backend, f"slots{index}") for index in range(3)))
+
+        async def stream(user, host):
+            async with backend.SessionLocal() as db:
+                items = [
+                    backend.ScanCreate(target_url=f"{host}-{index}.example", scan_type="basic") for index in range(3)
+                ]
+                response = await backend.create_batch_scan(items, user, db)
+                return [line async for line in response.body_iterator]
+        return await asyncio.gather(*(stream(user, f"slots{index}") for index, user in enumerate(users)))
+
+    streams = run(batches)
+    assert [len(lines) for lines in streams] == [3, 3, 3]
+    assert peak == 2
+
+
+def test_disconnected_batch_cancels_pending_scans_and_refunds_quota(backend, run, make_user, monkeypatch):
+    async def scan(target_url, progress=None):
+        if target_url.startswith("slow"):
+            await asyncio.sleep(3600)
+        return fake_results()
+    monkeypatch.setattr(backend, "perform_basic_scan", scan)
+    user = make_user(tier="professional")
+
+    async def read_first_line():
+        async with backend.SessionLocal() as db:
+            items = [
+                backend.ScanCreate(target_url=target, scan_type="basic")
+                for target in ("fast.example", "slow-1.example", "slow-2.example")
+            ]
+            response = await backend.create_batch_scan(items, user, db)
+            used_during = await db.scalar(select(backend.ScanQuota.used).where(backend.ScanQuota.user_id == user.id))
+            lines = response.body_iterator
+            await lines.__anext__()
+            await lines.aclose()
+            statuses = (await db.scalars(
+                select(backend.Scan.status).where(backend.Scan.user_id == user.id).order_by(backend.Scan.id)
+            )).all()
+            await db.rollback()
+            used_after = await db.scalar(select(backend.ScanQuota.used).where(backend.ScanQuota.user_id == user.id))
+            return used_during, statuses, used_after
+    assert run(read_first_line) == (3, ["completed", "cancelled", "cancelled"], 1)
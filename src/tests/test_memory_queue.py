@@ -0,0 +1,109 @@
+import asyncio
+import os
+import socket
+
+import pytest
+from sqlalchemy import select
+
+DEAD_OWNER = f"memory-{socket.gethostname()}-999999999"
+
+
+@pytest.fixture
+def memory_queue(backend, run, monkeypatch):
+    async def fresh_queue():
+        return asyncio.Queue(maxsize=backend.SCAN_QUEUE_SIZE)
+    monkeypatch.setattr(backend, "scan_queue", run(fresh_queue))
+    monkeypatch.setattr(backend, "memory_queue_owner", f"memory-{socket.gethostname()}-{os.getpid()}")
+    return backend.scan_queue
+
+
+def add_scans(backend, run, *rows):
+    async def add():
+        async with backend.SessionLocal() as db:
+            scans = [
+                backend.Scan(user_id=0, scan_type="basic", target_url="queue.example", **values)
+                for values in rows
+            ]
+            db.add_all(scans)
+            await db.commit()
+            return [scan.id for scan in scans]
+    return run(add)
+
+
+def scan_states(backend, run, scan_ids):
+    async def states():
+        async with backend.SessionLocal() as db:
+            return dict((await db.execute(
+                select(backend.Scan.id, backend.Scan.status).where(backend.Scan.id.in_(scan_ids))
+            )).all())
+    return run(states)
+
+
+def test_startup_recovers_scans_of_a_dead_process(backend, run, memory_queue):
+    queued, running, exhausted = add_scans(
+        backend, run,
+        {"status": "queued", "worker_id": DEAD_OWNER},
+        {"status": "running", "worker_id": DEAD_OWNER, "attempts": 1},
+        {"status": "running", "worker_id": DEAD_OWNER, "attempts": backend.SCAN_MAX_ATTEMPTS},
+    )
+    run(backend.recover_memory_queue)
+
+    assert scan_states(backend, run, [queued, running, exhausted]) == {
+        queued: "queued", running: "queued", exhausted: "failed",
+    }
+    enqueued = []
+    while not memory_queue.empty():
+        enqueued.append(memory_queue.get_nowait())
+    assert queued in enqueued and running in enqueued
+    assert exhausted not in enqueued
+
+
+def test_scans_of_a_live_process_are_left_alone(backend, run, memory_queue):
+    live_owner = f"memory-{socket.gethostname()}-1"
+    scan_id, = add_scans(backend, run, {"status": "running", "worker_id": live_owner})
+    run(backend.recover_memory_queue)
+    assert scan_states(backend, run, [scan_id]) == {scan_id: "running"}
+
+
+def test_cancelled_job_goes_back_to_the_queue(backend, run, memory_queue, monkeypatch):
+    started = []
+
+    async def hang(target_url, progress=None):
+        started.append(target_url)
+        await asyncio.sleep(3600)
+    monkeypatch.setattr(backend, "perform_basic_scan", hang)
+    scan_id, = add_scans(backend, run, {"status": "queued", "worker_id": backend.memory_queue_owner})
+
+    async def cancel_mid_scan():
+        job = asyncio.create_task(backend.run_scan_job(scan_id))
+        while not started:
+            await asyncio.sleep(0.01)
+        job.cancel()
+        await asyncio.gather(job, return_exceptions=True)
+    run(cancel_mid_scan)
+
+    assert scan_states(backend, run, [scan_id]) == {scan_id: "queued"}
+
+
+def test_queue_filled_during_commit_fails_the_scan_and_refunds_quota(backend, run, make_user, monkeypatch):
+    class RacingQueue(asyncio.Queue):
+        # full() aún dice que hay sitio; otra petición lo ocupa antes de put_nowait
+        def full(self):
+            return False
+
+        def put_nowait(self, item):
+            raise asyncio.QueueFull
+
+    async def racing_queue():
+        return RacingQueue(maxsize=1)
+    monkeypatch.setattr(backend, "scan_queue", run(racing_queue))
+    user = make_user(tier="professional")
+
+    async def create():
+        async with backend.SessionLocal() as db:
+            with pytest.raises(backend.HTTPException) as rejected:
+                await backend.create_scan(backend.ScanCreate(target_url="race.example", scan_type="basic"), user, db)
+            used = await db.scalar(select(backend.ScanQuota.used).where(backend.ScanQuota.user_id == user.id))
+            status = await db.scalar(select(backend.Scan.status).where(backend.Scan.target_url == "race.example"))
+            return rejected.value.status_code, used, status
+    assert run(create) == (503, 0, "failed")
@@ -0,0 +1,70 @@
+import os
+
+from sqlalchemy import create_engine, inspect, select, text
+
+# Esquema que creaba create_all antes de las migraciones, con results como str(dict)
+BASELINE_SCHEMA = (
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR UNIQUE, hashed_password VARCHAR, "
+    "company_name VARCHAR, subscription_tier VARCHAR, is_active BOOLEAN, created_at DATETIME)",
+    "CREATE INDEX ix_users_id ON users (id)",
+    "CREATE TABLE scans (id INTEGER PRIMARY KEY, user_id INTEGER, scan_type VARCHAR, target_url VARCHAR, "
+    "status VARCHAR, results VARCHAR, created_at DATETIME)",
+    "CREATE INDEX ix_scans_id ON scans (id)",
+)
+LEGACY_RESULTS = {
+    1: repr({"port_scan": [22, 443], "ssl_check": {"valid": True, "certificate": {"subject": ((("CN", "a"),),)}}}),
+    2: '{"port_scan": [80]}',
+    3: "{'port_scan': <not a literal>}",
+}
+
+
+def sqlite_engine(tmp_path, name):
+    return create_engine(f"sqlite:///{os.path.join(tmp_path, name)}")
+
+
+def schema(engine) -> dict:
+    inspector = inspect(engine)
+    return {
+        table: (
+            sorted(column["name"] for column in inspector.get_columns(table)),
+            sorted(index["name"] for index in inspector.get_indexes(table)),
+        )
+        for table in inspector.get_table_names()
+        if table != "schema_migrations"
+    }
+
+
+def test_baseline_database_upgrades(backend, tmp_path):
+    engine = sqlite_engine(tmp_path, "baseline.db")
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.execute(text(statement))
+        for scan_id, results in LEGACY_RESULTS.items():
+            conn.execute(
+                text("INSERT INTO scans (id, user_id, scan_type, target_url, status, results) "
+                     "VALUES (:id, 1, 'basic', 'example.com', 'completed', :results)"),
+                {"id": scan_id, "results": results},
+            )
+
+    with engine.begin() as conn:
+        applied = backend._apply_migrations(conn)
+    assert applied == [version for version, _, _ in backend.MIGRATIONS]
+    with engine.begin() as conn:
+        assert backend._apply_migrations(conn) == []
+
+    with engine.connect() as conn:
+        assert "parent_id" in {column["name"] for column in inspect(conn).get_columns("scans")}
+        results = dict(conn.execute(select(backend.Scan.id, backend.Scan.results).order_by(backend.Scan.id)).all())
+    assert results[1]["port_scan"] == [22, 443]
+    assert results[1]["ssl_check"]["certificate"]["subject"] == [[["CN", "a"]]]
+    assert results[2] == {"port_scan": [80]}
+    assert results[3]["error"] == "Unreadable legacy scan result"
+
+
+def test_fresh_database_matches_models(backend, tmp_path):
+    migrated = sqlite_engine(tmp_path, "migrated.db")
+    with migrated.begin() as conn:
+        backend._apply_migrations(conn)
+    modeled = sqlite_engine(tmp_path, "modeled.db")
+    backend.Base.metadata.create_all(modeled)
+    assert schema(migrated) == schema(modeled)
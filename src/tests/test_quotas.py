@@ -0,0 +1,68 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+
+def quota_used(backend, run, user):
+    async def used():
+        async with backend.SessionLocal() as db:
+            return await db.scalar(select(backend.ScanQuota.used).where(backend.ScanQuota.user_id == user.id))
+    return run(used)
+
+
+def consume(backend, run, user, requested=1):
+    async def consume():
+        async with backend.SessionLocal() as db:
+            await backend.consume_scan_quota(db, user, requested)
+    run(consume)
+
+
+def release(backend, run, user, released=1):
+    async def release():
+        async with backend.SessionLocal() as db:
+            await backend.release_scan_quota(db, user, released)
+    run(release)
+
+
+def test_reservation_stops_at_the_tier_limit(backend, run, make_user):
+    user = make_user(tier="professional")
+    limit = backend.SCAN_TIER_LIMITS["professional"]
+    consume(backend, run, user, limit - 1)
+    consume(backend, run, user)
+    assert quota_used(backend, run, user) == limit
+
+    with pytest.raises(HTTPException) as rejected:
+        consume(backend, run, user)
+    assert rejected.value.status_code == 403
+    # Una reserva rechazada no deja nada consumido
+    assert quota_used(backend, run, user) == limit
+
+
+def test_request_larger_than_remaining_quota_is_rejected_whole(backend, run, make_user):
+    user = make_user(tier="professional")
+    consume(backend, run, user, 2)
+    with pytest.raises(HTTPException):
+        consume(backend, run, user, backend.SCAN_TIER_LIMITS["professional"])
+    assert quota_used(backend, run, user) == 2
+
+
+def test_release_returns_quota(backend, run, make_user):
+    user = make_user(tier="basic")
+    limit = backend.SCAN_TIER_LIMITS["basic"]
+    consume(backend, run, user, limit)
+    with pytest.raises(HTTPException):
+        consume(backend, run, user)
+
+    release(backend, run, user)
+    assert quota_used(backend, run, user) == limit - 1
+    consume(backend, run, user)
+    # Liberar más de lo usado no deja el contador en negativo
+    release(backend, run, user, limit + 1)
+    assert quota_used(backend, run, user) == limit
+
+
+def test_tiers_without_limit_skip_the_quota(backend, run, make_user):
+    user = make_user(tier="enterprise")
+    for _ in range(3):
+        consume(backend, run, user, 100)
+    assert quota_used(backend, run, user) is None
@@ -0,0 +1,31 @@
+import pytest
+from fastapi import HTTPException
+
+
+def enforce(backend, run, *limits):
+    with pytest.raises(HTTPException) as rejected:
+        run(backend.enforce_rate_limits, *limits)
+    return rejected.value
+
+
+def test_exhausted_bucket_returns_retry_after(backend, run):
+    for _ in range(10):
+        run(backend.enforce_rate_limits, ("target", "retry.example", 10, 1))
+    rejection = enforce(backend, run, ("target", "retry.example", 10, 1))
+    assert rejection.status_code == 429
+    assert int(rejection.headers["Retry-After"]) >= 1
+
+
+def test_cost_above_capacity_is_rejected(backend, run):
+    # Un lote de 50 escaneos a un host no cabe en un bucket de 10 por minuto
+    rejection = enforce(backend, run, ("user", "batch-user", 100, 50), ("target", "batch.example", 10, 50))
+    assert rejection.status_code == 413
+    # Nada se consumió: el bucket del usuario sigue lleno
+    run(backend.enforce_rate_limits, ("user", "batch-user", 100, 100))
+
+
+def test_rejection_refunds_other_buckets(backend, run):
+    run(backend.enforce_rate_limits, ("target", "full.example", 5, 5))
+    rejection = enforce(backend, run, ("user", "refund-user", 5, 5), ("target", "full.example", 5, 1))
+    assert rejection.status_code == 429
+    run(backend.enforce_rate_limits, ("user", "refund-user", 5, 5))
@@ -0,0 +1,47 @@
+import asyncio
+
+from sqlalchemy import event, update
+
+
+def test_one_poll_serves_every_subscriber(backend, run, monkeypatch):
+    monkeypatch.setattr(backend, "SSE_DB_POLL_SECONDS", 0.01)
+
+    async def poll():
+        async with backend.SessionLocal() as db:
+            scans = [backend.Scan(user_id=0, scan_type="basic", target_url="sse.example", status="queued")
+                     for _ in range(50)]
+            db.add_all(scans)
+            await db.commit()
+            scan_ids = [scan.id for scan in scans]
+        queues = {scan_id: backend.scan_events.subscribe(scan_id) for scan_id in scan_ids}
+        for scan_id in scan_ids:
+            backend.scan_events.observe(scan_id, "queued")
+        # Otro proceso termina uno de los escaneos
+        async with backend.SessionLocal() as db:
+            await db.execute(update(backend.Scan).where(backend.Scan.id == scan_ids[0])
+                             .values(status="completed", results={"port_scan": [443]}))
+            await db.commit()
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            if "FROM scans" in statement:
+                statements.append(statement)
+        event.listen(backend.engine.sync_engine, "before_cursor_execute", count)
+        poller = asyncio.create_task(backend.poll_scan_events())
+        try:
+            received = await asyncio.wait_for(queues[scan_ids[0]].get(), timeout=5)
+        finally:
+            poller.cancel()
+            await asyncio.gather(poller, return_exceptions=True)
+            event.remove(backend.engine.sync_engine, "before_cursor_execute", count)
+            for scan_id, queue in queues.items():
+                backend.scan_events.unsubscribe(scan_id, queue)
+        idle = [queue.qsize() for scan_id, queue in queues.items() if scan_id != scan_ids[0]]
+        return received, statements, idle
+
+    received, statements, idle = run(poll)
+    assert received == ("completed", {"status": "completed", "results": {"port_scan": [443]}})
+    # Estados de los 50 en una consulta y resultados del terminado en otra
+    assert len(statements) == 2
+    assert set(idle) == {0}
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+# Por delante de cualquier fila que dejen en cola otros tests
+FIRST_IN_LINE = datetime(2000, 1, 1)
+
+
+@pytest.fixture
+def workers(backend, run):
+    async def create():
+        return backend.DatabaseScanWorker(1), backend.DatabaseScanWorker(1)
+    return run(create)
+
+
+def add_queued_scan(backend, run, **values):
+    async def add():
+        async with backend.SessionLocal() as db:
+            scan = backend.Scan(
+                user_id=None, scan_type="basic", target_url="lease.example",
+                status="queued", available_at=FIRST_IN_LINE, **values
+            )
+            db.add(scan)
+            await db.commit()
+            return scan.id
+    return run(add)
+
+
+def get_scan(backend, run, scan_id):
+    async def get():
+        async with backend.SessionLocal() as db:
+            return await db.get(backend.Scan, scan_id)
+    return run(get)
+
+
+def expire_lease(backend, run, scan_id):
+    async def expire():
+        async with backend.SessionLocal() as db:
+            await db.execute(
+                update(backend.Scan)
+                .where(backend.Scan.id == scan_id)
+                .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+            )
+            await db.commit()
+    run(expire)
+
+
+def reap(backend, run, worker):
+    async def reap():
+        async with backend.SessionLocal() as db:
+            await worker.reap_expired(db, datetime.utcnow())
+            await db.commit()
+    run(reap)
+
+
+def test_claim_is_exclusive_and_expired_lease_is_reclaimed(backend, run, workers, monkeypatch):
+    first, second = workers
+    scan_id = add_queued_scan(backend, run)
+
+    claimed = run(first.claim)
+    assert claimed[0] == scan_id and claimed[3] == 1
+    scan = get_scan(backend, run, scan_id)
+    assert (scan.status, scan.worker_id) == ("running", first.worker_id)
+    # Mientras el lease siga vigente nadie más lo recoge
+    other = run(second.claim)
+    assert other is None or other[0] != scan_id
+
+    expire_lease(backend, run, scan_id)
+    reap(backend, run, second)
+    scan = get_scan(backend, run, scan_id)
+    assert (scan.status, scan.worker_id) == ("queued", None)
+
+    async def move_to_front():
+        async with backend.SessionLocal() as db:
+            await db.execute(update(backend.Scan).where(backend.Scan.id == scan_id).values(available_at=FIRST_IN_LINE))
+            await db.commit()
+    run(move_to_front)
+    reclaimed = run(second.claim)
+    assert reclaimed[0] == scan_id and reclaimed[3] == 2
+
+    async def fake_scan(target_url, progress=None):
+        return {"target": target_url, "ssl_check": {}}
+    monkeypatch.setattr(backend, "perform_basic_scan", fake_scan)
+    # El worker que perdió el lease no puede pisar el resultado del nuevo dueño
+    run(first.execute, *claimed)
+    assert get_scan(backend, run, scan_id).status == "running"
+    run(second.execute, *reclaimed)
+    scan = get_scan(backend, run, scan_id)
+    assert scan.status == "completed"
+    assert scan.results == {"target": "lease.example", "ssl_check": {}}
+
+
+def test_expired_lease_without_attempts_left_fails(backend, run, workers):
+    worker, _ = workers
+    scan_id = add_queued_scan(backend, run, attempts=backend.SCAN_MAX_ATTEMPTS - 1)
+    assert run(worker.claim)[0] == scan_id
+
+    expire_lease(backend, run, scan_id)
+    reap(backend, run, worker)
+    scan = get_scan(backend, run, scan_id)
+    assert scan.status == "failed"
+    assert scan.results == {"error": "Worker lease expired"}
@@ -0,0 +1,39 @@
+import ipaddress
+
+import pytest
+from fastapi import HTTPException
+
+
+@pytest.mark.parametrize("target", [
+    "10.0.0.0/24",
+    "127.0.0.1-20",
+    "169.254.169.0/24",
+    "192.168.1.1-192.168.1.40",
+    "224.0.0.0/28",
+    "172.15.255.200-172.16.0.10",
+    "fe80::/120",
+    "::ffff:10.0.0.0/120",
+])
+def test_internal_ranges_are_rejected(backend, target):
+    user = backend.CurrentUser(id=1, email="ranges@example.com", subscription_tier="professional")
+    with pytest.raises(HTTPException) as rejected:
+        backend.validate_scan_range(target, user)
+    assert rejected.value.status_code == 400
+
+
+def test_public_range_is_accepted(backend):
+    user = backend.CurrentUser(id=1, email="ranges@example.com", subscription_tier="professional")
+    assert len(backend.validate_scan_range("8.8.8.0/24", user)) == 254
+
+
+def test_allow_list_permits_an_internal_network(backend, monkeypatch):
+    monkeypatch.setattr(backend, "SCAN_RANGE_ALLOWED_NETWORKS", [ipaddress.ip_network("10.20.0.0/16")])
+    user = backend.CurrentUser(id=1, email="ranges@example.com", subscription_tier="professional")
+    assert len(backend.validate_scan_range("10.20.30.0/24", user)) == 254
+    with pytest.raises(HTTPException):
+        backend.validate_scan_range("10.21.0.0/24", user)
+
+
+def test_sweep_never_probes_internal_addresses(backend, run):
+    assert run(backend.host_is_alive, ipaddress.ip_address("169.254.169.254")) is False
+    assert backend.address_is_internal(ipaddress.ip_address("8.8.8.8")) is False
@@ -0,0 +1,149 @@
+import asyncio
+import time
+import types
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from starlette.requests import Request
+
+
+def store_event(backend, run, event_id, event_type, payload, attempts=0):
+    async def store():
+        async with backend.SessionLocal() as db:
+            db.add(backend.StripeEvent(
+                id=event_id, type=event_type, created=int(time.time()), payload=payload,
+                status="received", attempts=attempts,
+            ))
+            await db.commit()
+    run(store)
+
+
+def load_event(backend, run, event_id):
+    async def load():
+        async with backend.SessionLocal() as db:
+            return await db.get(backend.StripeEvent, event_id)
+    return run(load)
+
+
+def subscription_event(user_id, subscription_id, price_id, status="active"):
+    return {
+        "data": {
+            "object": {
+                "id": subscription_id,
+                "object": "subscription",
+                "customer": f"cus_{user_id}",
+                "status": status,
+                "metadata": {"user_id": str(user_id)},
+                "items": {"data": [{"price": {"id": price_id}}]},
+            }
+        }
+    }
+
+
+def test_subscription_event_updates_tier(backend, run, make_user):
+    user = make_user(tier="free")
+    store_event(
+        backend, run, "evt_apply", "customer.subscription.updated",
+        subscription_event(user.id, "sub_apply", "price_pro"),
+    )
+    run(backend.process_stripe_event, "evt_apply")
+
+    event = load_event(backend, run, "evt_apply")
+    assert event.status == "processed"
+    assert event.attempts == 1
+
+    async def tier():
+        async with backend.SessionLocal() as db:
+            return await db.scalar(select(backend.User.subscription_tier).where(backend.User.id == user.id))
+    assert run(tier) == "professional"
+
+
+def test_failed_event_is_scheduled_for_retry(backend, run):
+    # Sin data.object: el fallo debe dejar el evento listo para reintentar, no en "processing"
+    store_event(backend, run, "evt_broken", "customer.subscription.updated", {"data": {}})
+    run(backend.process_stripe_event, "evt_broken")
+
+    event = load_event(backend, run, "evt_broken")
+    assert event.status == "received"
+    assert event.attempts == 1
+    assert event.error
+
+    async def next_event():
+        return await asyncio.wait_for(backend.stripe_event_queue.get(), timeout=5)
+    assert run(next_event) == "evt_broken"
+
+
+def test_failed_event_gives_up_after_max_attempts(backend, run):
+    store_event(
+        backend, run, "evt_exhausted", "customer.subscription.updated", {"data": {}},
+        attempts=backend.STRIPE_EVENT_MAX_ATTEMPTS - 1,
+    )
+    run(backend.process_stripe_event, "evt_exhausted")
+
+    event = load_event(backend, run, "evt_exhausted")
+    assert event.status == "failed"
+    assert event.attempts == backend.STRIPE_EVENT_MAX_ATTEMPTS
+
+
+class FakeStripe:
+    class error:
+        class StripeError(Exception):
+            pass
+
+    def __init__(self, decline_subscription=False):
+        self.calls = []
+        self.decline_subscription = decline_subscription
+        stripe = self
+
+        class Customer:
+            @staticmethod
+            def create(**params):
+                stripe.calls.append(("customer", params["idempotency_key"]))
+                return types.SimpleNamespace(id="cus_fake")
+
+        class Subscription:
+            @staticmethod
+            def create(**params):
+                stripe.calls.append(("subscription", params["idempotency_key"]))
+                if stripe.decline_subscription:
+                    raise FakeStripe.error.StripeError("Your card was declined")
+                payload = {
+                    "id": f"sub_fake_{len(stripe.calls)}", "customer": params["customer"], "status": "active",
+                    "metadata": params["metadata"], "items": {"data": [{"price": {"id": params["items"][0]["price"]}}]},
+                }
+                return types.SimpleNamespace(
+                    id=payload["id"], status="active", created=int(time.time()), to_dict=lambda: payload
+                )
+
+        self.Customer = Customer
+        self.Subscription = Subscription
+
+
+def subscribe(backend, run, user, plan_id="price_basic"):
+    async def call():
+        async with backend.SessionLocal() as db:
+            request = Request({"type": "http", "headers": []})
+            return await backend.create_subscription(plan_id, request, user, db)
+    return run(call)
+
+
+def test_declined_subscription_keeps_the_customer(backend, run, make_user, monkeypatch):
+    stripe = FakeStripe(decline_subscription=True)
+    monkeypatch.setattr(backend, "get_stripe", lambda: stripe)
+    user = make_user(tier="free")
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            subscribe(backend, run, user)
+    # El cliente se crea una vez y cada intento de suscripción usa una clave nueva
+    assert [kind for kind, _ in stripe.calls] == ["customer", "subscription", "subscription"]
+    assert stripe.calls[0][1] == f"customer-{user.id}"
+    assert stripe.calls[1][1] != stripe.calls[2][1]
+
+    stripe.decline_subscription = False
+    response = subscribe(backend, run, user)
+    assert response["status"] == "active"
+    assert [kind for kind, _ in stripe.calls].count("customer") == 1
+    # Con una suscripción activa, un segundo clic no llama a Stripe
+    assert subscribe(backend, run, user) == {"subscription_id": response["subscription_id"]}
+    assert len(stripe.calls) == 4